@@ -182,7 +182,8 @@ def main():
 # crawler/build_index.py
 # Builds a MINIMAL index.json with NO source-identifying fields.
 
-import os, re, json, time, html, datetime
+import os, sys, re, json, time, html, datetime, gzip, zlib, unicodedata
+from concurrent.futures import ProcessPoolExecutor
 from urllib.parse import urljoin, urlparse
 import requests
 from bs4 import BeautifulSoup
@@ -208,6 +209,11 @@ TIMEOUT = 25
 SLEEP = 1.2
 MAX_TOTAL = 400
 
+# Capture every fetched page to a per-run gzip archive, or rebuild from one offline.
+ARCHIVE_CAPTURE = os.environ.get("ARCHIVE_CAPTURE", "").strip()  # archive dir
+ARCHIVE_REPLAY = os.environ.get("ARCHIVE_REPLAY", "").strip()    # archive dir (latest run) or run file
+REPLAY_WORKERS = int(os.environ.get("REPLAY_WORKERS", "0")) or None  # None = all cores
+
 def clean(s):
     if not s: return ""
     s = html.unescape(s)
@@ -240,22 +246,28 @@ def safe_date_iso(s):
         return f"{y}-{mo}-{d}"
     return None
 
-def head_info(url):
+def head_headers(url):
     try:
         r = requests.head(url, headers=HEADERS, timeout=TIMEOUT, allow_redirects=True)
-        ctype = (r.headers.get("Content-Type") or "").lower()
-        is_pdf = "application/pdf" in ctype or url.lower().endswith(".pdf")
-        size = r.headers.get("Content-Length")
-        size = int(size) if size and size.isdigit() else None
-        lastmod = safe_date_iso(r.headers.get("Last-Modified"))
-        return is_pdf, size, lastmod
+        return dict(r.headers)
     except Exception:
-        return url.lower().endswith(".pdf"), None, None
+        return None
 
-def fetch(url):
+def head_meta(url, headers):
+    if headers is None:
+        return url.lower().endswith(".pdf"), None, None
+    headers = {k.lower(): v for k, v in headers.items()}
+    ctype = (headers.get("content-type") or "").lower()
+    is_pdf = "application/pdf" in ctype or url.lower().endswith(".pdf")
+    size = headers.get("content-length")
+    size = int(size) if size and size.isdigit() else None
+    lastmod = safe_date_iso(headers.get("last-modified"))
+    return is_pdf, size, lastmod
+
+def fetch_response(url):
     r = requests.get(url, headers=HEADERS, timeout=TIMEOUT)
     r.raise_for_status()
-    return r.text
+    return r
 
 def same_site(u, base):
     try:
@@ -348,7 +360,7 @@ def extract_links(base, html_text, page_url):
         out.append(u)
     return out
 
-def crawl_source(src):
+def crawl_source(src, archive=None):
     base = src["base"]; start = src["start"]
     allow = src.get("allow_offsite", False)
     max_pages = src.get("max_pages", 10)
@@ -360,15 +372,25 @@ def crawl_source(src):
         seen.add(url)
         if not allow and not same_site(url, base): continue
 
-        is_pdf, size, lastmod = head_info(url)
+        head = head_headers(url)
+        is_pdf, size, lastmod = head_meta(url, head)
+        resp = None
         if is_pdf:
             html_text = ""
         else:
             try:
-                html_text = fetch(url)
+                resp = fetch_response(url)
+                html_text = resp.text
             except Exception:
                 continue
 
+        if archive is not None:
+            try:
+                archive_page(archive, start, url, head, resp)
+            except Exception as e:
+                # a failed capture must not drop the page from the index
+                print(f"Archive write failed for {url}: {e}", file=sys.stderr)
+
         try:
             results.append(extract_record(url, html_text, is_pdf, size, lastmod))
         except Exception:
@@ -394,16 +416,176 @@ def dedupe(recs):
             seen.add(u); out.append(r)
     return out
 
-def main():
-    pages_dir = os.environ.get("PAGES_DIR", "").strip()
-    target = os.path.join(pages_dir, "index.json") if pages_dir else "index.json"
+# ---------- typeahead suggestions ----------
+# Small prefix shards (suggest/<2 chars>.json) so the frontend can offer
+# completions without loading or indexing the whole corpus.
+
+SUGGEST_DIR = "suggest"
+SUGGEST_PREFIX = 2
+SUGGEST_WEIGHTS = {"title": 3, "word": 1, "tag": 1}
+SUGGEST_WORD = re.compile(r"[^\W\d_][\w'\-]{2,}")
+SUGGEST_STOPWORDS = {
+    "the", "and", "for", "from", "with", "about", "into", "this", "that",    # en
+    "der", "die", "das", "und", "von", "mit", "den", "des", "dem", "ein",   # de
+    "een", "het", "van", "voor", "met",                                     # nl
+    "les", "aux", "par", "pour", "sur", "une",                              # fr
+    "quae", "qui", "quod", "sive", "atque", "cum",                          # la
+}
 
+# Must stay in step with shardKey() in index.html: first SUGGEST_PREFIX code
+# points, anything outside [a-z0-9] becomes "_".
+def shard_key(term):
+    key = term[:SUGGEST_PREFIX]
+    return re.sub(r"[^a-z0-9]", "_", key)
+
+def suggest_terms(recs):
+    weights = {}
+    def add(term, w):
+        term = unicodedata.normalize("NFC", clean(term)).lower()
+        if len(term) < SUGGEST_PREFIX or len(term) > 80: return
+        weights[term] = weights.get(term, 0) + w
+    for r in recs:
+        title = r.get("title") or ""
+        add(title, SUGGEST_WEIGHTS["title"])
+        for w in set(SUGGEST_WORD.findall(title.lower())):
+            if w not in SUGGEST_STOPWORDS:
+                add(w, SUGGEST_WEIGHTS["word"])
+        for t in r.get("tags") or []:
+            add(t, SUGGEST_WEIGHTS["tag"])
+    return weights
+
+def write_suggest(recs, pages_dir):
+    out_dir = os.path.join(pages_dir, SUGGEST_DIR) if pages_dir else SUGGEST_DIR
+    os.makedirs(out_dir, exist_ok=True)
+    # drop shards from a previous run so removed prefixes don't linger
+    for name in os.listdir(out_dir):
+        if name.endswith(".json"):
+            os.remove(os.path.join(out_dir, name))
+
+    shards = {}
+    for term, w in suggest_terms(recs).items():
+        shards.setdefault(shard_key(term), []).append([term, w])
+    for key, items in shards.items():
+        # UTF-16 order matches JS string comparison, so the client can
+        # binary-search and range-scan a prefix
+        items.sort(key=lambda it: it[0].encode("utf-16-be"))
+        with open(os.path.join(out_dir, key + ".json"), "w", encoding="utf-8") as f:
+            json.dump(items, f, ensure_ascii=False, separators=(",", ":"))
+    print(f"Wrote {len(shards)} suggestion shards to {out_dir}")
+
+# ---------- capture / replay archive ----------
+# WARC-style: each capture run writes <ARCHIVE_CAPTURE>/<run>.jsonl.gz, one
+# gzip member per fetched page (HEAD headers plus GET status/headers/body),
+# flushed as it goes so a killed crawl loses at most the page in flight.
+
+RUN_ID = datetime.datetime.now(datetime.timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+ARCHIVE_EXT = ".jsonl.gz"
+ARCHIVE_CHUNK = 1 << 16
+GZIP_MAGIC = b"\x1f\x8b\x08"
+
+def open_capture(archive_dir):
+    os.makedirs(archive_dir, exist_ok=True)
+    # "xb": never fold two crawls into one run file
+    return open(os.path.join(archive_dir, RUN_ID + ARCHIVE_EXT), "xb")
+
+def archive_page(archive, source, url, head, resp):
+    entry = {
+        "run": RUN_ID,
+        "source": source,
+        "url": url,
+        "date": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "head": head,
+        "status": resp.status_code if resp is not None else None,
+        "headers": dict(resp.headers) if resp is not None else None,
+        "body": resp.text if resp is not None else "",
+    }
+    archive.write(gzip.compress(json.dumps(entry, ensure_ascii=False).encode("utf-8")))
+    archive.flush()
+
+def gzip_members(data):
+    # Decode member by member in bounded chunks; on a torn or corrupt member,
+    # resync at the next gzip header so later pages are still recovered.
+    view, pos = memoryview(data), 0
+    while pos < len(data):
+        start, parts = pos, []
+        d = zlib.decompressobj(zlib.MAX_WBITS | 16)
+        try:
+            while pos < len(data) and not d.eof:
+                chunk = view[pos:pos + ARCHIVE_CHUNK]
+                parts.append(d.decompress(chunk))
+                pos += len(chunk) - len(d.unused_data)
+            ok = d.eof
+        except zlib.error:
+            ok = False
+        if ok:
+            yield b"".join(parts)
+        else:
+            pos = data.find(GZIP_MAGIC, start + 1)
+            if pos < 0: return
+
+def read_archive(path):
+    with open(path, "rb") as f:
+        data = f.read()
+    entries = []
+    for raw in gzip_members(data):
+        try:
+            entries.append(json.loads(raw.decode("utf-8")))
+        except ValueError:
+            continue
+    return entries
+
+def latest_run(archive_dir):
+    runs = sorted(n for n in os.listdir(archive_dir) if n.endswith(ARCHIVE_EXT))
+    if not runs:
+        raise SystemExit(f"No capture runs in {archive_dir}")
+    return os.path.join(archive_dir, runs[-1])
+
+def replay_page(entry):
+    url = entry["url"]
+    is_pdf, size, lastmod = head_meta(url, entry.get("head"))
+    try:
+        return extract_record(url, entry.get("body") or "", is_pdf, size, lastmod)
+    except Exception:
+        return None
+
+def replay(path):
+    t0 = time.time()
+    if os.path.isdir(path):
+        path = latest_run(path)
+    pages = read_archive(path)
+    # re-apply each source's max_pages the way crawl_source counts results
+    caps = {src["start"]: src.get("max_pages", 10) for src in SOURCES}
+    counts, recs = {}, []
+    with ProcessPoolExecutor(max_workers=REPLAY_WORKERS) as pool:
+        for entry, rec in zip(pages, pool.map(replay_page, pages, chunksize=8)):
+            if not rec: continue
+            src = entry.get("source")
+            if src in caps and counts.get(src, 0) >= caps[src]: continue
+            counts[src] = counts.get(src, 0) + 1
+            recs.append(rec)
+    print(f"Replayed {len(pages)} pages from {path} in {time.time() - t0:.2f}s")
+    return recs
+
+def crawl(archive=None):
     allrecs = []
     for src in SOURCES:
         try:
-            allrecs.extend(crawl_source(src))
+            allrecs.extend(crawl_source(src, archive))
         except Exception:
             pass
+    return allrecs
+
+def main():
+    pages_dir = os.environ.get("PAGES_DIR", "").strip()
+    target = os.path.join(pages_dir, "index.json") if pages_dir else "index.json"
+
+    if ARCHIVE_REPLAY:
+        allrecs = replay(ARCHIVE_REPLAY)
+    elif ARCHIVE_CAPTURE:
+        with open_capture(ARCHIVE_CAPTURE) as archive:
+            allrecs = crawl(archive)
+    else:
+        allrecs = crawl()
 
     allrecs = dedupe(allrecs)[:MAX_TOTAL]
     def sort_key(r):
@@ -415,6 +597,7 @@ def main():
     with open(target, "w", encoding="utf-8") as f:
         json.dump(allrecs, f, ensure_ascii=False, indent=2)
     print(f"Wrote {len(allrecs)} records to {target}")
+    write_suggest(allrecs, pages_dir)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# crawler/check_suggest.py
+# Sanity check for typeahead shards: python crawler/check_suggest.py
+
+import os, sys, re, json, shutil, subprocess, tempfile
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+import build_index as b
+
+RECS = [
+    {"title": "Über die Alchemie", "tags": ["alchemy forum"]},
+    {"title": "Rosæ Crucis and the Fama", "tags": []},
+    {"title": "Éliphas Lévi: Dogme et Rituel", "tags": ["tarot"]},
+    {"title": "alchemy and the Hermetic art", "tags": ["alchemy forum"]},
+]
+KEYS = ["über", "éliphas", "al", "a", "rosæ crucis", "9th", "ß", "\U0001d504bc"]
+
+def js_shard_keys(terms):
+    # run the real shardKey() from index.html so the two can't drift apart
+    node = shutil.which("node")
+    if not node: return None
+    with open(os.path.join(HERE, "..", "index.html"), encoding="utf-8") as f:
+        page = f.read()
+    fn = re.search(r"function shardKey\(p\)\{.*?\}", page).group(0)
+    src = f"const SUGGEST_PREFIX={b.SUGGEST_PREFIX};{fn}console.log(JSON.stringify({json.dumps(terms)}.map(shardKey)));"
+    return json.loads(subprocess.run([node, "-e", src], capture_output=True, text=True, check=True).stdout)
+
+def main():
+    terms = b.suggest_terms(RECS)
+    assert "über" in terms and "rosæ" in terms and "éliphas" in terms
+    assert "ber" not in terms and "ros" not in terms
+    assert not set(terms) & b.SUGGEST_STOPWORDS
+    assert terms["alchemy forum"] == 2 * b.SUGGEST_WEIGHTS["tag"]
+
+    assert b.shard_key("über") == "_b"
+    assert b.shard_key("éliphas") == "_l"
+    assert b.shard_key("alchemie") == "al"
+
+    with tempfile.TemporaryDirectory() as d:
+        b.write_suggest(RECS, d)
+        out = os.path.join(d, b.SUGGEST_DIR)
+        for term, w in terms.items():
+            with open(os.path.join(out, b.shard_key(term) + ".json"), encoding="utf-8") as f:
+                assert [term, w] in json.load(f), term
+        for name in os.listdir(out):
+            with open(os.path.join(out, name), encoding="utf-8") as f:
+                items = [t for t, _ in json.load(f)]
+            assert items == sorted(items, key=lambda t: t.encode("utf-16-be")), name
+
+    js = js_shard_keys(KEYS)
+    if js is None:
+        print("node not found; skipped index.html shardKey comparison")
+    else:
+        assert js == [b.shard_key(k) for k in KEYS], (js, [b.shard_key(k) for k in KEYS])
+    print("suggest checks passed")
+
+if __name__ == "__main__":
+    main()